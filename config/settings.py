@@ -9,12 +9,17 @@ class Settings:
     SEC_API_BASE_URL = os.getenv('SEC_API_BASE_URL', 'https://www.sec.gov/Archives/edgar')
     USER_AGENT = os.getenv('USER_AGENT', 'fund-retriever contact@yourcompany.com')
     REQUEST_DELAY = float(os.getenv('REQUEST_DELAY', '0.1'))
+    REQUEST_TIMEOUT = float(os.getenv('REQUEST_TIMEOUT', '30'))  # seconds per SEC request
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '16'))
+    MAX_WORKERS = int(os.getenv('MAX_WORKERS', '4'))  # Concurrent funds in batch runs
     
     # Storage Configuration
     PROJECT_ROOT = Path(__file__).parent.parent
     DATA_DIR = PROJECT_ROOT / 'data'
     PROSPECTUS_DIR = DATA_DIR / 'prospectuses'
     LOG_DIR = DATA_DIR / 'logs'
+    CACHE_DIR = DATA_DIR / 'cache'
+    CACHE_TTL = int(os.getenv('CACHE_TTL', '86400'))  # seconds; used when SEC sends no ETag
     
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -25,5 +30,6 @@ class Settings:
         cls.DATA_DIR.mkdir(exist_ok=True)
         cls.PROSPECTUS_DIR.mkdir(exist_ok=True)
         cls.LOG_DIR.mkdir(exist_ok=True)
+        cls.CACHE_DIR.mkdir(exist_ok=True)
 
 settings = Settings()
\ No newline at end of file
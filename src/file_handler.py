@@ -8,15 +8,20 @@ from pathlib import Path
 from datetime import datetime
 from typing import Optional
 import hashlib
+import threading
+from collections import Counter
 
 from config.settings import settings
 from src.models import ProspectusData
+from src.utils import format_file_size
 
 
 class FileHandler:
     def __init__(self):
         self.prospectus_dir = settings.PROSPECTUS_DIR
         self.logger = logging.getLogger(__name__)
+        # Serializes read-modify-write of download_summary.json across batch worker threads
+        self._summary_lock = threading.Lock()
         
         # Ensure the prospectus directory exists
         self.prospectus_dir.mkdir(parents=True, exist_ok=True)
@@ -144,51 +149,52 @@ class FileHandler:
     def _update_summary_log(self, prospectus_data: ProspectusData, file_path: Path, metadata: dict):
         """Update summary log with information about saved prospectuses"""
         try:
-            summary_log_path = self.prospectus_dir / 'download_summary.json'
-            
-            # Load existing summary or create new one
-            if summary_log_path.exists():
-                with open(summary_log_path, 'r', encoding='utf-8') as f:
-                    summary_data = json.load(f)
-            else:
-                summary_data = {
-                    'downloads': [],
-                    'last_updated': None,
-                    'total_downloads': 0,
-                    'checkpoints_completed': []
+            with self._summary_lock:
+                summary_log_path = self.prospectus_dir / 'download_summary.json'
+                
+                # Load existing summary or create new one
+                if summary_log_path.exists():
+                    with open(summary_log_path, 'r', encoding='utf-8') as f:
+                        summary_data = json.load(f)
+                else:
+                    summary_data = {
+                        'downloads': [],
+                        'last_updated': None,
+                        'total_downloads': 0,
+                        'checkpoints_completed': []
+                    }
+                
+                # Add new entry
+                summary_entry = {
+                    'fund_symbol': prospectus_data.fund_symbol,
+                    'filing_date': prospectus_data.filing_date.isoformat(),
+                    'download_timestamp': datetime.now().isoformat(),
+                    'form_type': prospectus_data.form_type,
+                    'file_path': str(file_path.relative_to(self.prospectus_dir)),
+                    'file_size': file_path.stat().st_size,
+                    'success': True,
+                    'document_type': prospectus_data.document_type,
+                    'cik': prospectus_data.cik,
+                    'accession_number': prospectus_data.accession_number
                 }
-            
-            # Add new entry
-            summary_entry = {
-                'fund_symbol': prospectus_data.fund_symbol,
-                'filing_date': prospectus_data.filing_date.isoformat(),
-                'download_timestamp': datetime.now().isoformat(),
-                'form_type': prospectus_data.form_type,
-                'file_path': str(file_path.relative_to(self.prospectus_dir)),
-                'file_size': file_path.stat().st_size,
-                'success': True,
-                'document_type': prospectus_data.document_type,
-                'cik': prospectus_data.cik,
-                'accession_number': prospectus_data.accession_number
-            }
-            
-            summary_data['downloads'].append(summary_entry)
-            summary_data['last_updated'] = datetime.now().isoformat()
-            summary_data['total_downloads'] = len(summary_data['downloads'])
-            
-            # Track checkpoint completion
-            if 'checkpoints_completed' not in summary_data:
-                summary_data['checkpoints_completed'] = []
-            
-            # Keep only the most recent 1000 entries to prevent file from growing too large
-            if len(summary_data['downloads']) > 1000:
-                summary_data['downloads'] = summary_data['downloads'][-1000:]
-            
-            # Save updated summary
-            with open(summary_log_path, 'w', encoding='utf-8') as f:
-                json.dump(summary_data, f, indent=2, ensure_ascii=False)
-            
-            self.logger.debug(f"Updated summary log: {summary_log_path}")
+                
+                summary_data['downloads'].append(summary_entry)
+                summary_data['last_updated'] = datetime.now().isoformat()
+                summary_data['total_downloads'] = len(summary_data['downloads'])
+                
+                # Track checkpoint completion
+                if 'checkpoints_completed' not in summary_data:
+                    summary_data['checkpoints_completed'] = []
+                
+                # Keep only the most recent 1000 entries to prevent file from growing too large
+                if len(summary_data['downloads']) > 1000:
+                    summary_data['downloads'] = summary_data['downloads'][-1000:]
+                
+                # Save updated summary
+                with open(summary_log_path, 'w', encoding='utf-8') as f:
+                    json.dump(summary_data, f, indent=2, ensure_ascii=False)
+                
+                self.logger.debug(f"Updated summary log: {summary_log_path}")
             
         except Exception as e:
             self.logger.error(f"Error updating summary log: {str(e)}")
@@ -196,41 +202,42 @@ class FileHandler:
     def update_checkpoint_completion(self, checkpoint: str, stats: dict):
         """Update summary log with checkpoint completion information"""
         try:
-            summary_log_path = self.prospectus_dir / 'download_summary.json'
-            
-            # Load existing summary
-            if summary_log_path.exists():
-                with open(summary_log_path, 'r', encoding='utf-8') as f:
-                    summary_data = json.load(f)
-            else:
-                summary_data = {
-                    'downloads': [],
-                    'last_updated': None,
-                    'total_downloads': 0,
-                    'checkpoints_completed': []
+            with self._summary_lock:
+                summary_log_path = self.prospectus_dir / 'download_summary.json'
+                
+                # Load existing summary
+                if summary_log_path.exists():
+                    with open(summary_log_path, 'r', encoding='utf-8') as f:
+                        summary_data = json.load(f)
+                else:
+                    summary_data = {
+                        'downloads': [],
+                        'last_updated': None,
+                        'total_downloads': 0,
+                        'checkpoints_completed': []
+                    }
+                
+                # Add checkpoint completion info
+                checkpoint_entry = {
+                    'checkpoint': checkpoint,
+                    'completion_timestamp': datetime.now().isoformat(),
+                    'statistics': stats
                 }
-            
-            # Add checkpoint completion info
-            checkpoint_entry = {
-                'checkpoint': checkpoint,
-                'completion_timestamp': datetime.now().isoformat(),
-                'statistics': stats
-            }
-            
-            # Remove any existing entry for this checkpoint
-            summary_data['checkpoints_completed'] = [
-                cp for cp in summary_data.get('checkpoints_completed', [])
-                if cp.get('checkpoint') != checkpoint
-            ]
-            
-            summary_data['checkpoints_completed'].append(checkpoint_entry)
-            summary_data['last_updated'] = datetime.now().isoformat()
-            
-            # Save updated summary
-            with open(summary_log_path, 'w', encoding='utf-8') as f:
-                json.dump(summary_data, f, indent=2, ensure_ascii=False)
-            
-            self.logger.info(f"Updated checkpoint completion for: {checkpoint}")
+                
+                # Remove any existing entry for this checkpoint
+                summary_data['checkpoints_completed'] = [
+                    cp for cp in summary_data.get('checkpoints_completed', [])
+                    if cp.get('checkpoint') != checkpoint
+                ]
+                
+                summary_data['checkpoints_completed'].append(checkpoint_entry)
+                summary_data['last_updated'] = datetime.now().isoformat()
+                
+                # Save updated summary
+                with open(summary_log_path, 'w', encoding='utf-8') as f:
+                    json.dump(summary_data, f, indent=2, ensure_ascii=False)
+                
+                self.logger.info(f"Updated checkpoint completion for: {checkpoint}")
             
         except Exception as e:
             self.logger.error(f"Error updating checkpoint completion: {str(e)}")
@@ -248,33 +255,29 @@ class FileHandler:
             
             downloads = summary_data.get('downloads', [])
             
-            # Calculate statistics
-            total_downloads = len(downloads)
-            unique_funds = len(set(d.get('fund_symbol') for d in downloads if d.get('fund_symbol')))
-            
-            # Form type distribution
-            form_types = {}
+            # Calculate all statistics in a single pass over the download log
+            fund_symbols = set()
+            form_types = Counter()
+            doc_types = Counter()
+            total_size = 0
             for download in downloads:
+                fund_symbol = download.get('fund_symbol')
+                if fund_symbol:
+                    fund_symbols.add(fund_symbol)
                 form_type = download.get('form_type')
                 if form_type:
-                    form_types[form_type] = form_types.get(form_type, 0) + 1
-            
-            # Document type distribution
-            doc_types = {}
-            for download in downloads:
+                    form_types[form_type] += 1
                 doc_type = download.get('document_type')
                 if doc_type:
-                    doc_types[doc_type] = doc_types.get(doc_type, 0) + 1
-            
-            # Total file size
-            total_size = sum(d.get('file_size', 0) for d in downloads)
+                    doc_types[doc_type] += 1
+                total_size += download.get('file_size', 0)
             
             return {
-                'total_downloads': total_downloads,
-                'unique_funds': unique_funds,
+                'total_downloads': len(downloads),
+                'unique_funds': len(fund_symbols),
                 'total_size_bytes': total_size,
-                'form_type_distribution': form_types,
-                'document_type_distribution': doc_types,
+                'form_type_distribution': dict(form_types),
+                'document_type_distribution': dict(doc_types),
                 'checkpoints_completed': summary_data.get('checkpoints_completed', []),
                 'last_updated': summary_data.get('last_updated')
             }
@@ -295,7 +298,7 @@ class FileHandler:
                 "## Summary Statistics",
                 f"- Total prospectuses downloaded: {stats['total_downloads']:,}",
                 f"- Unique fund symbols: {stats['unique_funds']:,}",
-                f"- Total data size: {self._format_file_size_mb(stats.get('total_size_bytes', 0))}",
+                f"- Total data size: {format_file_size(stats.get('total_size_bytes', 0))}",
                 f"- Last updated: {stats.get('last_updated', 'N/A')}",
                 ""
             ]
@@ -355,14 +358,6 @@ class FileHandler:
             self.logger.error(f"Error generating batch report: {str(e)}")
             return f"Error generating report: {str(e)}"
     
-    def _format_file_size_mb(self, size_bytes: int) -> str:
-        """Format file size in human-readable format"""
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.1f} TB"
-    
     def get_existing_prospectus(self, fund_symbol: str, filing_date: datetime = None) -> Optional[Path]:
         """Check if a prospectus already exists for the given fund and date"""
         try:
@@ -7,18 +7,116 @@ import json
 import logging
 import time
 import re
+import sys
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from dataclasses import dataclass
+from types import MappingProxyType
 import requests
 
 from config.settings import settings
-from src.sec_client import SECClient
+from src.sec_client import SECClient, rate_limit
 from src.file_handler import FileHandler
-from src.utils import ProgressTracker, normalize_fund_symbol
+from src.utils import ProgressTracker, format_file_size, normalize_fund_symbol
 
 
-@dataclass
+# Name keywords and the provider they identify, checked in priority order
+_PROVIDER_KEYWORDS = (
+    ('VANGUARD', 'Vanguard'),
+    ('SPDR', 'SPDR'),
+    ('STATE STREET', 'SPDR'),
+    ('BLACKROCK', 'iShares'),
+    ('ISHARES', 'iShares'),
+    ('INVESCO', 'Invesco'),
+    ('FIDELITY', 'Fidelity'),
+    ('SCHWAB', 'Schwab'),
+    ('ARK', 'ARK'),
+    ('PROSHARES', 'ProShares'),
+)
+
+
+# Registrant CIKs of the major fund families, and the reverse lookup (read-only)
+_PROVIDER_CIKS = MappingProxyType({
+    sys.intern(provider): sys.intern(cik) for provider, cik in {
+        'Vanguard': '0000862084',
+        'SPDR': '0000884394',
+        'iShares': '0000930667',
+        'Invesco': '0000931748',
+        'Fidelity': '0000315066',
+    }.items()
+})
+_CIK_TO_PROVIDER = MappingProxyType({cik: provider for provider, cik in _PROVIDER_CIKS.items()})
+
+
+def _match_provider_keyword(name: str) -> Optional[str]:
+    """Return the provider whose keyword first appears in a company or fund name"""
+    name_upper = name.upper()
+    for keyword, provider in _PROVIDER_KEYWORDS:
+        if keyword in name_upper:
+            return provider
+    return None
+
+
+# Ticker shapes accepted by last-resort discovery: (prefix, suffix, length, provider, fund_type)
+_TICKER_PATTERN_RULES = (
+    ('V', 'X', 5, 'Vanguard', 'MUTUAL_FUND'),  # Vanguard mutual funds (V***X)
+    ('F', 'X', 5, 'Fidelity', 'MUTUAL_FUND'),  # Fidelity mutual funds (F***X)
+)
+
+
+def _build_prefix_trie(rules) -> Dict[str, Any]:
+    """Build a character trie; the None key of a node holds the rules for that prefix"""
+    trie = {}
+    for rule in rules:
+        node = trie
+        for char in rule[0]:
+            node = node.setdefault(char, {})
+        node.setdefault(None, []).append(rule)
+    return trie
+
+
+_TICKER_PATTERN_TRIE = _build_prefix_trie(_TICKER_PATTERN_RULES)
+
+# Known ETF tickers per provider, for the reliable ticker pattern checks
+_ISHARES_ETF_TICKERS = frozenset({'IWM', 'EFA', 'IEF', 'IJH', 'IJR', 'TLT'})
+_VANGUARD_ETF_TICKERS = frozenset({'VTI', 'VOO', 'VEA', 'BND'})
+
+# Title phrases marking a company tickers entry as an ETF
+_ETF_TITLE_MARKERS = ('ETF', 'EXCHANGE TRADED', 'INDEX FUND')
+
+# Known major stock symbols that aren't funds
+_MAJOR_STOCK_SYMBOLS = frozenset({
+    'AAPL', 'MSFT', 'GOOGL', 'GOOG', 'AMZN', 'TSLA', 'META', 'NVDA',
+    'JPM', 'JNJ', 'V', 'PG', 'HD', 'MA', 'UNH', 'DIS', 'PYPL', 'ADBE',
+    'NFLX', 'CRM', 'TMO', 'ABT', 'COST', 'PFE', 'XOM', 'KO', 'PEP', 'WMT'
+})
+
+# Substrings that mark a symbol as test/placeholder data
+_TEST_SYMBOL_MARKERS = ('UNKNOWN', 'FUND123', 'RANDOM', 'TEST', 'FAKE', 'INVALID', 'SAMPLE')
+
+# More than 2 digits anywhere in a symbol suggests test data
+_TEST_SYMBOL_DIGITS_RE = re.compile(r'(?:\D*\d){3}')
+
+
+def _match_ticker_pattern(symbol: str) -> Optional[Tuple[str, str]]:
+    """Return (provider, fund_type) for the longest prefix rule the symbol satisfies"""
+    match = None
+    node = _TICKER_PATTERN_TRIE
+    for char in symbol:
+        node = node.get(char)
+        if node is None:
+            break
+        for _, suffix, length, provider, fund_type in node.get(None, ()):
+            if len(symbol) == length and symbol.endswith(suffix):
+                match = (provider, fund_type)
+    return match
+
+
+@dataclass(slots=True)
 class FundInfo:
     """Generic data structure for fund information"""
     ticker: str
@@ -30,7 +128,7 @@ class FundInfo:
     class_id: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class RetrievalResult:
     """Result of attempting to retrieve a fund prospectus"""
     fund: FundInfo
@@ -44,24 +142,46 @@ class RetrievalResult:
     processing_time: Optional[float] = None
     discovery_method: Optional[str] = None  # How we found the fund
     supplements_found: int = 0
+    skipped: bool = False  # True when an existing download was reused
+
+
+@lru_cache(maxsize=4096)
+def _detect_etf_provider(symbol: str) -> Optional[str]:
+    """Detect ETF provider from ticker patterns; pure over the symbol, so memoized"""
+    # Only return providers for patterns that are very reliable
+    if symbol.startswith('SPY') and len(symbol) == 3:  # Only SPY, not random symbols starting with SPY
+        return 'SPDR'
+    elif symbol.startswith('QQQ') and len(symbol) in (3, 4):  # QQQ, QQQM
+        return 'Invesco'
+    elif symbol in _ISHARES_ETF_TICKERS:  # Known iShares ETFs
+        return 'iShares'
+    elif symbol in _VANGUARD_ETF_TICKERS:  # Known Vanguard 3-letter ETFs
+        return 'Vanguard'
+    elif symbol.startswith('XL') and len(symbol) == 3:  # SPDR sector ETFs (XLF, XLK, etc.)
+        return 'SPDR'
+    elif symbol == 'GLD':  # Specific known SPDR gold ETF
+        return 'SPDR'
+    
+    # Remove catch-all patterns that were causing false positives
+    return None
 
 
 class GenericFundProcessor:
     """Processes arbitrary fund symbols using multiple discovery strategies"""
     
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
         self.logger = logging.getLogger(__name__)
-        self.sec_client = SECClient()
+        self.sec_client = SECClient(session=session)
         self.file_handler = FileHandler()
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': settings.USER_AGENT,
-            'Accept': 'application/json'
-        })
+        # Share the SEC client's pooled session so discovery and retrieval
+        # calls reuse the same keep-alive connections
+        self.session = self.sec_client.session
         
         # Cache for company tickers to avoid repeated API calls
-        self._tickers_cache = None
+        # (the mutual fund tickers file is cached by the SEC client)
         self._company_tickers_cache = None
+        self._company_titles_upper = []  # (upper-cased title, company record) pairs for name searches
+        self._cache_lock = threading.Lock()  # Guards lazy cache loads from batch worker threads
         
     def retrieve_fund_prospectus(self, fund_symbol: str) -> RetrievalResult:
         """Retrieve prospectus for any fund symbol using multiple strategies"""
@@ -170,33 +290,22 @@ class GenericFundProcessor:
     def _discover_from_mutual_fund_json(self, fund_symbol: str) -> Optional[FundInfo]:
         """Discover fund from SEC mutual fund tickers JSON"""
         try:
-            if not self._tickers_cache:
-                self.logger.info("Fetching mutual fund tickers from SEC...")
-                url = "https://www.sec.gov/files/company_tickers_mf.json"
-                
-                time.sleep(settings.REQUEST_DELAY)
-                response = self.session.get(url)
-                
-                if response.status_code == 200:
-                    self._tickers_cache = response.json()
-                else:
-                    self.logger.warning(f"Failed to fetch mutual fund tickers: HTTP {response.status_code}")
-                    return None
-            
-            if 'fields' in self._tickers_cache and 'data' in self._tickers_cache:
-                for record in self._tickers_cache['data']:
-                    if len(record) >= 4:
-                        cik, series_id, class_id, symbol = record[:4]
-                        if symbol.upper() == fund_symbol.upper():
-                            provider = self._determine_provider_from_cik_dynamically(str(cik))
-                            return FundInfo(
-                                ticker=symbol,
-                                cik_str=str(cik).zfill(10),
-                                title=f"{provider} {symbol}" if provider else f"Fund {symbol}",
-                                provider=provider,
-                                series_id=series_id,
-                                class_id=class_id
-                            )
+            mf_index = self.sec_client.get_mutual_fund_index()
+            if not mf_index:
+                return None
+            
+            record = mf_index.get(fund_symbol.upper())
+            if record:
+                cik, series_id, class_id, symbol = record[:4]
+                provider = self._determine_provider_from_cik_dynamically(str(cik))
+                return FundInfo(
+                    ticker=symbol,
+                    cik_str=str(cik).zfill(10),
+                    title=f"{provider} {symbol}" if provider else f"Fund {symbol}",
+                    provider=provider,
+                    series_id=series_id,
+                    class_id=class_id
+                )
             
             return None
             
@@ -241,28 +350,22 @@ class GenericFundProcessor:
     def _search_sec_company_tickers(self, fund_symbol: str) -> Optional[FundInfo]:
         """Search regular SEC company tickers (some ETFs are listed here)"""
         try:
-            if not self._company_tickers_cache:
-                url = "https://www.sec.gov/files/company_tickers.json"
-                
-                time.sleep(settings.REQUEST_DELAY)
-                response = self.session.get(url)
-                
-                if response.status_code == 200:
-                    self._company_tickers_cache = response.json()
-                else:
-                    self.logger.warning(f"Failed to fetch company tickers: HTTP {response.status_code}")
-                    return None
+            company_tickers = self._load_company_tickers()
+            if not company_tickers:
+                return None
             
             # Search through company tickers
-            for key, company_info in self._company_tickers_cache.items():
+            symbol_upper = fund_symbol.upper()
+            for key, company_info in company_tickers.items():
                 if isinstance(company_info, dict):
                     ticker = company_info.get('ticker', '')
-                    if ticker.upper() == fund_symbol.upper():
+                    if ticker.upper() == symbol_upper:
                         cik = str(company_info.get('cik_str', '')).zfill(10)
                         title = company_info.get('title', f"Fund {ticker}")
                         
                         # Try to determine if this is an ETF based on title
-                        if any(etf_indicator in title.upper() for etf_indicator in ['ETF', 'EXCHANGE TRADED', 'INDEX FUND']):
+                        title_upper = title.upper()
+                        if any(marker in title_upper for marker in _ETF_TITLE_MARKERS):
                             provider = self._extract_provider_from_title(title)
                             return FundInfo(
                                 ticker=ticker,
@@ -278,6 +381,30 @@ class GenericFundProcessor:
             self.logger.error(f"Error searching SEC company tickers: {str(e)}")
             return None
 
+    def _load_company_tickers(self) -> Optional[Dict[str, Any]]:
+        """Fetch SEC company tickers once, upper-casing titles up front for name searches"""
+        if not self._company_tickers_cache:
+            with self._cache_lock:
+                if not self._company_tickers_cache:
+                    url = "https://www.sec.gov/files/company_tickers.json"
+                    
+                    rate_limit()
+                    response = self.session.get(url, timeout=settings.REQUEST_TIMEOUT)
+                    
+                    if response.status_code != 200:
+                        self.logger.warning(f"Failed to fetch company tickers: HTTP {response.status_code}")
+                        return None
+                    
+                    company_tickers = response.json()
+                    self._company_titles_upper = [
+                        (company_info.get('title', '').upper(), company_info)
+                        for company_info in company_tickers.values()
+                        if isinstance(company_info, dict)
+                    ]
+                    self._company_tickers_cache = company_tickers
+        
+        return self._company_tickers_cache
+
     def _search_sec_by_ticker(self, fund_symbol: str) -> Optional[FundInfo]:
         """Search SEC submissions API using ticker symbol patterns"""
         try:
@@ -310,22 +437,13 @@ class GenericFundProcessor:
     def _find_company_cik_by_name(self, company_name: str) -> Optional[str]:
         """Find CIK for a company by searching SEC data"""
         try:
-            if not self._company_tickers_cache:
-                url = "https://www.sec.gov/files/company_tickers.json"
-                
-                time.sleep(settings.REQUEST_DELAY)
-                response = self.session.get(url)
-                
-                if response.status_code == 200:
-                    self._company_tickers_cache = response.json()
-                else:
-                    return None
+            if not self._load_company_tickers():
+                return None
             
-            for key, company_info in self._company_tickers_cache.items():
-                if isinstance(company_info, dict):
-                    title = company_info.get('title', '').upper()
-                    if company_name.upper() in title:
-                        return str(company_info.get('cik_str', '')).zfill(10)
+            name_upper = company_name.upper()
+            for title_upper, company_info in self._company_titles_upper:
+                if name_upper in title_upper:
+                    return str(company_info.get('cik_str', '')).zfill(10)
             
             return None
             
@@ -367,8 +485,8 @@ class GenericFundProcessor:
             # Try to get recent submissions and look for the fund symbol
             url = f"https://data.sec.gov/submissions/CIK{cik.zfill(10)}.json"
             
-            time.sleep(settings.REQUEST_DELAY)
-            response = self.session.get(url)
+            rate_limit()
+            response = self.session.get(url, timeout=settings.REQUEST_TIMEOUT)
             
             if response.status_code == 200:
                 data = response.json()
@@ -395,69 +513,12 @@ class GenericFundProcessor:
 
     def _extract_provider_from_title(self, title: str) -> Optional[str]:
         """Extract provider name from SEC filing title"""
-        title_upper = title.upper()
-        
-        provider_indicators = {
-            'VANGUARD': 'Vanguard',
-            'SPDR': 'SPDR',
-            'STATE STREET': 'SPDR',
-            'BLACKROCK': 'iShares',
-            'ISHARES': 'iShares',
-            'INVESCO': 'Invesco',
-            'FIDELITY': 'Fidelity',
-            'SCHWAB': 'Schwab',
-            'ARK': 'ARK',
-            'PROSHARES': 'ProShares'
-        }
-        
-        for indicator, provider in provider_indicators.items():
-            if indicator in title_upper:
-                return provider
-        
-        return None
+        return _match_provider_keyword(title)
 
     def _normalize_provider_name(self, company_name: str) -> str:
         """Normalize company name to standard provider name"""
-        company_upper = company_name.upper()
-        
-        if 'STATE STREET' in company_upper or 'SPDR' in company_upper:
-            return 'SPDR'
-        elif 'BLACKROCK' in company_upper or 'ISHARES' in company_upper:
-            return 'iShares'
-        elif 'VANGUARD' in company_upper:
-            return 'Vanguard'
-        elif 'INVESCO' in company_upper:
-            return 'Invesco'
-        elif 'FIDELITY' in company_upper:
-            return 'Fidelity'
-        elif 'SCHWAB' in company_upper:
-            return 'Schwab'
-        elif 'ARK' in company_upper:
-            return 'ARK'
-        elif 'PROSHARES' in company_upper:
-            return 'ProShares'
-        else:
-            return company_name
+        return _match_provider_keyword(company_name) or company_name
 
-    def _detect_etf_provider_by_pattern(self, symbol: str) -> Optional[str]:
-        """Detect ETF provider based on ticker patterns (no hardcoded CIKs)"""
-        
-        # Common ETF ticker patterns - these are industry standards
-        if symbol.startswith(('SPY', 'XL', 'GLD')):
-            return 'SPDR'
-        elif symbol.startswith(('IWM', 'EFA', 'IEF', 'IJH', 'IJR')):
-            return 'iShares'  
-        elif symbol.startswith('V') and len(symbol) == 3:  # VTI, VOO, VEA, etc.
-            return 'Vanguard'
-        elif symbol in ['QQQ', 'QQQM'] or symbol.startswith('PFF'):
-            return 'Invesco'
-        elif symbol.startswith(('ARK', 'ARKK', 'ARKQ')):
-            return 'ARK'
-        elif symbol.startswith(('SCH', 'SCHW')):
-            return 'Schwab'
-        
-        return None
-    
     def _discover_by_direct_cik(self, fund_symbol: str) -> Optional[FundInfo]:
         """Try to use the symbol as a direct CIK"""
         try:
@@ -467,8 +528,8 @@ class GenericFundProcessor:
                 
                 # Try to validate this CIK exists
                 url = f"https://data.sec.gov/api/xbrl/companyfacts/CIK{cik}.json"
-                time.sleep(settings.REQUEST_DELAY)
-                response = self.session.get(url)
+                rate_limit()
+                response = self.session.get(url, timeout=settings.REQUEST_TIMEOUT)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -501,72 +562,32 @@ class GenericFundProcessor:
             self.logger.error(f"Error in SEC search: {str(e)}")
             return None
     
-    def _discover_by_pattern_matching(self, fund_symbol: str) -> Optional[FundInfo]:
-        """Last resort: pattern-based discovery with dynamic CIK lookup"""
-        try:
-            symbol_upper = fund_symbol.upper()
-            
-            # Vanguard patterns
-            if ((symbol_upper.startswith('V') and symbol_upper.endswith('X') and len(symbol_upper) == 5) or
-                (symbol_upper.startswith('V') and len(symbol_upper) == 3)):
-                
-                cik = self._find_provider_cik_dynamically('Vanguard')
-                if cik:
-                    return FundInfo(
-                        ticker=fund_symbol,
-                        cik_str=cik,
-                        title=f"Vanguard {fund_symbol}",
-                        provider="Vanguard",
-                        fund_type="ETF" if len(symbol_upper) == 3 else "MUTUAL_FUND"
-                    )
-            
-            # Fidelity patterns
-            if symbol_upper.startswith('F') and symbol_upper.endswith('X') and len(symbol_upper) == 5:
-                cik = self._find_provider_cik_dynamically('Fidelity')
-                if cik:
-                    return FundInfo(
-                        ticker=fund_symbol,
-                        cik_str=cik,
-                        title=f"Fidelity {fund_symbol}",
-                        provider="Fidelity",
-                        fund_type="MUTUAL_FUND"
-                    )
-            
-            return None
-            
-        except Exception as e:
-            self.logger.error(f"Error in pattern matching: {str(e)}")
-            return None
+    def _get_provider_cik(self, provider: str) -> Optional[str]:
+        """Get the registrant CIK of a known fund provider"""
+        return _PROVIDER_CIKS.get(provider)
+    
+    def _determine_provider_from_cik(self, cik: str) -> Optional[str]:
+        """Get the provider for a known registrant CIK"""
+        return _CIK_TO_PROVIDER.get(cik)
     
     def _determine_provider_from_cik_dynamically(self, cik: str) -> Optional[str]:
         """Determine fund provider from CIK by looking up company name"""
         try:
-            # First try to get company name from companyfacts API
+            # Known registrants need no API round trip
+            provider = self._determine_provider_from_cik(cik.zfill(10))
+            if provider:
+                return provider
+            
+            # Otherwise get company name from companyfacts API
             url = f"https://data.sec.gov/api/xbrl/companyfacts/CIK{cik.zfill(10)}.json"
-            time.sleep(settings.REQUEST_DELAY)
-            response = self.session.get(url)
+            rate_limit()
+            response = self.session.get(url, timeout=settings.REQUEST_TIMEOUT)
             
             if response.status_code == 200:
                 data = response.json()
-                entity_name = data.get('entityName', '').upper()
                 
                 # Extract provider from entity name
-                if 'VANGUARD' in entity_name:
-                    return 'Vanguard'
-                elif 'FIDELITY' in entity_name:
-                    return 'Fidelity'
-                elif 'STATE STREET' in entity_name or 'SPDR' in entity_name:
-                    return 'SPDR'
-                elif 'BLACKROCK' in entity_name or 'ISHARES' in entity_name:
-                    return 'iShares'
-                elif 'INVESCO' in entity_name:
-                    return 'Invesco'
-                elif 'SCHWAB' in entity_name:
-                    return 'Schwab'
-                elif 'ARK' in entity_name:
-                    return 'ARK'
-                elif 'PROSHARES' in entity_name:
-                    return 'ProShares'
+                return _match_provider_keyword(data.get('entityName', ''))
             
             return None
             
@@ -578,52 +599,33 @@ class GenericFundProcessor:
                               skip_existing: bool = True) -> List[RetrievalResult]:
         """Process multiple arbitrary fund symbols"""
         try:
-            self.logger.info(f"Starting batch processing of {len(fund_symbols)} arbitrary funds")
+            self.logger.info("Starting batch processing of %d arbitrary funds", len(fund_symbols))
             
             # Initialize progress tracking
             progress = ProgressTracker(len(fund_symbols), "Processing arbitrary funds")
             results = []
             
             start_time = datetime.now()
-            
-            for i, symbol in enumerate(fund_symbols):
-                self.logger.info(f"\n--- Processing fund {i+1}/{len(fund_symbols)}: {symbol} ---")
-                
-                # Check if fund already exists
-                if skip_existing:
-                    existing_file = self.file_handler.get_existing_prospectus(symbol)
-                    if existing_file:
-                        self.logger.info(f"Skipping {symbol} - already exists: {existing_file.name}")
-                        result = RetrievalResult(
-                            fund=FundInfo(ticker=symbol),
-                            success=True,
-                            file_path=str(existing_file),
-                            error_message="Skipped - file already exists",
-                            processing_time=0.0
-                        )
-                        results.append(result)
-                        progress.update()
-                        continue
-                
-                # Process individual fund
-                result = self.retrieve_fund_prospectus(symbol)
-                results.append(result)
-                
-                # Update progress
-                progress.update()
-                
-                # Log result
-                if result.success:
-                    if result.file_size:
-                        self.logger.info(f" {symbol}: Success - {result.file_size:,} bytes ({result.discovery_method})")
-                    else:
-                        self.logger.info(f" {symbol}: Success - {result.error_message}")
-                else:
-                    self.logger.warning(f" {symbol}: Failed - {result.error_message}")
-                
-                # Rate limiting between funds
-                if i < len(fund_symbols) - 1:
-                    time.sleep(settings.REQUEST_DELAY * 2)
+            total = len(fund_symbols)
+            
+            # Funds are HTTP-bound, so a thread pool overlaps them; rate_limit() paces
+            # the individual SEC requests across all workers
+            executor = ThreadPoolExecutor(max_workers=settings.MAX_WORKERS)
+            try:
+                futures = [
+                    executor.submit(self._process_batch_fund, symbol, i + 1, total, skip_existing)
+                    for i, symbol in enumerate(fund_symbols)
+                ]
+                # Collect in submission order so results line up with fund_symbols
+                for future in futures:
+                    results.append(future.result())
+                    progress.update()
+            except BaseException:
+                # On a worker error or Ctrl-C, drop the queued funds instead of
+                # finishing the whole batch before the exception surfaces
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+            executor.shutdown()
             
             progress.finish()
             
@@ -636,105 +638,147 @@ class GenericFundProcessor:
             return results
             
         except Exception as e:
-            self.logger.error(f"Error in batch processing: {str(e)}")
+            self.logger.error("Error in batch processing: %s", e)
             raise
     
+    def _process_batch_fund(self, symbol: str, position: int, total: int,
+                            skip_existing: bool) -> RetrievalResult:
+        """Process one fund of a batch; runs on a worker thread"""
+        self.logger.info("\n--- Processing fund %d/%d: %s ---", position, total, symbol)
+        
+        # Check if fund already exists
+        if skip_existing:
+            existing_file = self.file_handler.get_existing_prospectus(symbol)
+            if existing_file:
+                self.logger.info("Skipping %s - already exists: %s", symbol, existing_file.name)
+                return RetrievalResult(
+                    fund=FundInfo(ticker=symbol),
+                    success=True,
+                    file_path=str(existing_file),
+                    error_message="Skipped - file already exists",
+                    processing_time=0.0,
+                    skipped=True
+                )
+        
+        # Process individual fund
+        result = self.retrieve_fund_prospectus(symbol)
+        
+        # Log result
+        if result.success:
+            if result.file_size:
+                # Grouped size is formatted eagerly, so only build it when INFO is on
+                if self.logger.isEnabledFor(logging.INFO):
+                    self.logger.info(" %s: Success - %s bytes (%s)", symbol, f"{result.file_size:,}", result.discovery_method)
+            else:
+                self.logger.info(" %s: Success - %s", symbol, result.error_message)
+        else:
+            self.logger.warning(" %s: Failed - %s", symbol, result.error_message)
+        
+        return result
+    
     def _log_batch_summary(self, results: List[RetrievalResult], start_time: datetime):
         """Log summary of batch processing results"""
+        # Everything below is INFO output; skip the aggregation entirely when it would be dropped
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        
         end_time = datetime.now()
         total_time = (end_time - start_time).total_seconds()
         
-        successful = [r for r in results if r.success and not (r.error_message and "already exists" in r.error_message)]
+        successful = [r for r in results if r.success and not r.skipped]
         failed = [r for r in results if not r.success]
-        skipped = [r for r in results if r.success and r.error_message and "already exists" in r.error_message]
+        skipped = [r for r in results if r.skipped]
         
         total_size = sum(r.file_size or 0 for r in successful)
         
-        self.logger.info("\n" + "="*80)
+        self.logger.info("\n%s", "=" * 80)
         self.logger.info(" ARBITRARY FUND PROCESSING SUMMARY")
-        self.logger.info("="*80)
-        self.logger.info(f"Total funds processed: {len(results)}")
-        self.logger.info(f"Successful downloads: {len(successful)}")
-        self.logger.info(f" Skipped (already exist): {len(skipped)}")
-        self.logger.info(f" Failed downloads: {len(failed)}")
-        self.logger.info(f" Success rate: {(len(successful) / len(results) * 100):.1f}%")
-        self.logger.info(f" Total data downloaded: {self._format_file_size(total_size)}")
-        self.logger.info(f" Total processing time: {total_time:.1f} seconds")
+        self.logger.info("=" * 80)
+        self.logger.info("Total funds processed: %d", len(results))
+        self.logger.info("Successful downloads: %d", len(successful))
+        self.logger.info(" Skipped (already exist): %d", len(skipped))
+        self.logger.info(" Failed downloads: %d", len(failed))
+        self.logger.info(" Success rate: %.1f%%", len(successful) / len(results) * 100)
+        self.logger.info(" Total data downloaded: %s", format_file_size(total_size))
+        self.logger.info(" Total processing time: %.1f seconds", total_time)
         
         # Discovery method breakdown
-        discovery_methods = {}
-        for result in successful:
-            method = result.discovery_method or "Unknown"
-            discovery_methods[method] = discovery_methods.get(method, 0) + 1
+        discovery_methods = Counter(r.discovery_method or "Unknown" for r in successful)
         
         if discovery_methods:
-            self.logger.info(f"\n Discovery methods used:")
+            self.logger.info("\n Discovery methods used:")
             for method, count in sorted(discovery_methods.items()):
-                self.logger.info(f"  • {method}: {count} funds")
+                self.logger.info("  • %s: %d funds", method, count)
         
         # Error category breakdown
-        error_categories = {}
-        for result in failed:
-            category = result.error_category or "OTHER"
-            error_categories[category] = error_categories.get(category, 0) + 1
+        error_categories = Counter(r.error_category or "OTHER" for r in failed)
         
         if error_categories:
-            self.logger.info(f"\n Error categories:")
+            self.logger.info("\n Error categories:")
             for category, count in sorted(error_categories.items()):
-                self.logger.info(f"  • {category}: {count} funds")
+                self.logger.info("  • %s: %d funds", category, count)
         
-        self.logger.info("="*80)
-    
-    def _format_file_size(self, size_bytes: int) -> str:
-        """Format file size in human-readable format"""
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.1f} TB"
+        self.logger.info("=" * 80)
     
     def _save_batch_results(self, results: List[RetrievalResult], batch_type: str):
         """Save detailed batch results to JSON file"""
         try:
-            batch_results = {
+            successful = skipped = failed = 0
+            for result in results:
+                if not result.success:
+                    failed += 1
+                elif result.skipped:
+                    skipped += 1
+                else:
+                    successful += 1
+            
+            batch_summary = {
                 'processing_timestamp': datetime.now().isoformat(),
                 'batch_type': batch_type,
                 'total_funds': len(results),
-                'successful_downloads': sum(1 for r in results if r.success and not (r.error_message and "already exists" in r.error_message)),
-                'skipped_funds': sum(1 for r in results if r.success and r.error_message and "already exists" in r.error_message),
-                'failed_downloads': sum(1 for r in results if not r.success),
-                'results': []
+                'successful_downloads': successful,
+                'skipped_funds': skipped,
+                'failed_downloads': failed
             }
             
-            for result in results:
-                result_data = {
-                    'ticker': result.fund.ticker,
-                    'title': result.fund.title,
-                    'cik': result.fund.cik_str,
-                    'fund_type': result.fund.fund_type,
-                    'provider': result.fund.provider,
-                    'success': result.success,
-                    'file_path': result.file_path,
-                    'error_message': result.error_message,
-                    'error_category': result.error_category,
-                    'file_size': result.file_size,
-                    'filing_date': result.filing_date.isoformat() if result.filing_date else None,
-                    'form_type': result.form_type,
-                    'discovery_method': result.discovery_method,
-                    'processing_time': result.processing_time
-                }
-                batch_results['results'].append(result_data)
-            
-            # Save to file
+            # Stream records to disk one at a time instead of building the
+            # full results list in memory first; layout matches json.dump(indent=2)
             results_file = settings.PROSPECTUS_DIR / f'{batch_type}_batch_results.json'
             with open(results_file, 'w', encoding='utf-8') as f:
-                json.dump(batch_results, f, indent=2, ensure_ascii=False)
+                f.write('{\n')
+                for key, value in batch_summary.items():
+                    f.write(f'  {json.dumps(key)}: {json.dumps(value, ensure_ascii=False)},\n')
+                f.write('  "results": [')
+                for i, result in enumerate(results):
+                    record = json.dumps(self._result_record(result), indent=2, ensure_ascii=False)
+                    f.write(',\n    ' if i else '\n    ')
+                    f.write(record.replace('\n', '\n    '))
+                f.write('\n  ]\n}' if results else ']\n}')
             
             self.logger.info(f" Detailed results saved to: {results_file}")
             
         except Exception as e:
             self.logger.error(f"Error saving batch results: {str(e)}")
 
+    def _result_record(self, result: RetrievalResult) -> Dict[str, Any]:
+        """Convert a retrieval result to its JSON-serializable batch record"""
+        return {
+            'ticker': result.fund.ticker,
+            'title': result.fund.title,
+            'cik': result.fund.cik_str,
+            'fund_type': result.fund.fund_type,
+            'provider': result.fund.provider,
+            'success': result.success,
+            'file_path': result.file_path,
+            'error_message': result.error_message,
+            'error_category': result.error_category,
+            'file_size': result.file_size,
+            'filing_date': result.filing_date.isoformat() if result.filing_date else None,
+            'form_type': result.form_type,
+            'discovery_method': result.discovery_method,
+            'processing_time': result.processing_time
+        }
+
     def _discover_from_etf_sources(self, fund_symbol: str) -> Optional[FundInfo]:
         """Discover ETF information using dynamic SEC searches with proper validation"""
         try:
@@ -781,8 +825,8 @@ class GenericFundProcessor:
             # Get recent submissions for this provider
             url = f"https://data.sec.gov/submissions/CIK{cik.zfill(10)}.json"
             
-            time.sleep(settings.REQUEST_DELAY)
-            response = self.session.get(url)
+            rate_limit()
+            response = self.session.get(url, timeout=settings.REQUEST_TIMEOUT)
             
             if response.status_code != 200:
                 self.logger.warning(f"Could not access submissions for CIK {cik}: HTTP {response.status_code}")
@@ -856,53 +900,23 @@ class GenericFundProcessor:
 
     def _detect_etf_provider_by_pattern(self, symbol: str) -> Optional[str]:
         """Detect ETF provider based on ticker patterns with stricter validation"""
-        
-        # Only return providers for patterns that are very reliable
-        if symbol.startswith('SPY') and len(symbol) == 3:  # Only SPY, not random symbols starting with SPY
-            return 'SPDR'
-        elif symbol.startswith('QQQ') and len(symbol) in [3, 4]:  # QQQ, QQQM
-            return 'Invesco'
-        elif symbol in ['IWM', 'EFA', 'IEF', 'IJH', 'IJR', 'TLT']:  # Known iShares ETFs
-            return 'iShares'
-        elif symbol in ['VTI', 'VOO', 'VEA', 'BND'] and len(symbol) == 3:  # Known Vanguard 3-letter ETFs
-            return 'Vanguard'
-        elif symbol.startswith('XL') and len(symbol) == 3:  # SPDR sector ETFs (XLF, XLK, etc.)
-            return 'SPDR'
-        elif symbol == 'GLD':  # Specific known SPDR gold ETF
-            return 'SPDR'
-        
-        # Remove catch-all patterns that were causing false positives
-        return None
+        return _detect_etf_provider(symbol)
 
     def _discover_by_pattern_matching(self, fund_symbol: str) -> Optional[FundInfo]:
         """Last resort: pattern-based discovery with strict validation"""
         try:
-            symbol_upper = fund_symbol.upper()
-            
-            # Only match very specific, reliable patterns
-            
-            # Vanguard mutual fund patterns (V****X)
-            if (symbol_upper.startswith('V') and symbol_upper.endswith('X') and len(symbol_upper) == 5):
-                cik = self._find_provider_cik_dynamically('Vanguard')
-                if cik and self._validate_fund_exists_for_provider(fund_symbol, cik, 'Vanguard'):
-                    return FundInfo(
-                        ticker=fund_symbol,
-                        cik_str=cik,
-                        title=f"Vanguard {fund_symbol}",
-                        provider="Vanguard",
-                        fund_type="MUTUAL_FUND"
-                    )
-            
-            # Fidelity mutual fund patterns (F****X)
-            if (symbol_upper.startswith('F') and symbol_upper.endswith('X') and len(symbol_upper) == 5):
-                cik = self._find_provider_cik_dynamically('Fidelity')
-                if cik and self._validate_fund_exists_for_provider(fund_symbol, cik, 'Fidelity'):
+            # Only match very specific, reliable patterns (see _TICKER_PATTERN_RULES)
+            pattern = _match_ticker_pattern(fund_symbol.upper())
+            if pattern:
+                provider, fund_type = pattern
+                cik = self._find_provider_cik_dynamically(provider)
+                if cik and self._validate_fund_exists_for_provider(fund_symbol, cik, provider):
                     return FundInfo(
                         ticker=fund_symbol,
                         cik_str=cik,
-                        title=f"Fidelity {fund_symbol}",
-                        provider="Fidelity",
-                        fund_type="MUTUAL_FUND"
+                        title=f"{provider} {fund_symbol}",
+                        provider=provider,
+                        fund_type=fund_type
                     )
             
             # Do NOT provide fallback for unknown patterns
@@ -934,15 +948,7 @@ class GenericFundProcessor:
 
     def _is_likely_stock_symbol(self, symbol: str) -> bool:
         """Check if symbol is likely a stock ticker rather than a fund"""
-        
-        # Known major stock symbols that aren't funds
-        major_stocks = {
-            'AAPL', 'MSFT', 'GOOGL', 'GOOG', 'AMZN', 'TSLA', 'META', 'NVDA',
-            'JPM', 'JNJ', 'V', 'PG', 'HD', 'MA', 'UNH', 'DIS', 'PYPL', 'ADBE',
-            'NFLX', 'CRM', 'TMO', 'ABT', 'COST', 'PFE', 'XOM', 'KO', 'PEP', 'WMT'
-        }
-        
-        return symbol.upper() in major_stocks
+        return symbol.upper() in _MAJOR_STOCK_SYMBOLS
 
     def _is_obviously_invalid_symbol(self, symbol: str) -> bool:
         """Check if symbol is obviously invalid/test data"""
@@ -950,17 +956,9 @@ class GenericFundProcessor:
         symbol_upper = symbol.upper()
         
         # Common test/invalid patterns
-        invalid_patterns = [
-            'UNKNOWN', 'FUND123', 'RANDOM', 'TEST', 'FAKE', 'INVALID', 'SAMPLE'
-        ]
-        
-        for pattern in invalid_patterns:
+        for pattern in _TEST_SYMBOL_MARKERS:
             if pattern in symbol_upper:
                 return True
         
         # Check for obvious test patterns (numbers, special chars, etc.)
-        if any(char.isdigit() for char in symbol):
-            if len([c for c in symbol if c.isdigit()]) > 2:  # More than 2 digits suggests test data
-                return True
-        
-        return False
\ No newline at end of file
+        return _TEST_SYMBOL_DIGITS_RE.match(symbol) is not None
\ No newline at end of file
@@ -19,7 +19,7 @@ from config.settings import settings
 from src.sec_client import SECClient
 from src.file_handler import FileHandler
 from src.generic_fund_processor import GenericFundProcessor
-from src.utils import setup_logging, validate_fund_symbol, normalize_fund_symbol
+from src.utils import setup_logging, validate_fund_symbol, normalize_fund_symbol, format_file_size
 
 def main():
     """Main function supporting single fund, batch Vanguard, and arbitrary fund processing"""
@@ -229,7 +229,7 @@ def run_batch_processing(args, logger):
         
         if successful:
             total_size = sum(r.file_size or 0 for r in successful)
-            print(f"Total data downloaded: {processor._format_file_size(total_size)}")
+            print(f"Total data downloaded: {format_file_size(total_size)}")
         
         print(f"\nDetailed results saved to: data/prospectuses/vanguard_batch_results.json")
         print(f"Prospectuses saved in: data/prospectuses/[TICKER]/")
@@ -318,9 +318,9 @@ def run_arbitrary_fund_processing(args, logger, fund_symbols):
             total_duration = (end_time - start_time).total_seconds()
             
             # Generate summary
-            successful = [r for r in results if r.success and not (r.error_message and "already exists" in r.error_message)]
+            successful = [r for r in results if r.success and not r.skipped]
             failed = [r for r in results if not r.success]
-            skipped = [r for r in results if r.success and r.error_message and "already exists" in r.error_message]
+            skipped = [r for r in results if r.skipped]
             
             print(f"\nARBITRARY FUND BATCH PROCESSING COMPLETED")
             print(f"Total time: {total_duration:.1f} seconds")
@@ -332,7 +332,7 @@ def run_arbitrary_fund_processing(args, logger, fund_symbols):
             
             if successful:
                 total_size = sum(r.file_size or 0 for r in successful)
-                print(f"Total data downloaded: {processor._format_file_size(total_size)}")
+                print(f"Total data downloaded: {format_file_size(total_size)}")
             
             # Show discovery method breakdown
             discovery_methods = {}
@@ -6,7 +6,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
-@dataclass
+@dataclass(slots=True)
 class ProspectusData:
     fund_symbol: str
     filing_date: datetime
@@ -3,29 +3,125 @@ SEC EDGAR API client for retrieving fund prospectuses.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+import threading
 import time
 import logging
 import json
+import os
 import re
+import tempfile
+from functools import lru_cache
 from typing import Optional, Dict, Any, List
 from bs4 import BeautifulSoup
 from datetime import datetime
+from pathlib import Path
 from urllib.parse import urljoin, urlparse
 
 from config.settings import settings
 from src.models import ProspectusData
 
 
+# Shared by every client so concurrent batch workers stay within SEC's request rate
+_rate_limit_lock = threading.Lock()
+_next_request_at = 0.0  # time.monotonic() value before which no request may start
+
+
+def rate_limit():
+    """Space SEC requests REQUEST_DELAY apart across all threads"""
+    global _next_request_at
+    with _rate_limit_lock:
+        # Only wait out what's left of the interval; slow responses already used it up
+        wait = _next_request_at - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _next_request_at = time.monotonic() + settings.REQUEST_DELAY
+
+
+def create_session() -> requests.Session:
+    """Create a pooled HTTP session carrying the SEC-required headers"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=settings.HTTP_POOL_SIZE,
+        pool_maxsize=settings.HTTP_POOL_SIZE
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'User-Agent': settings.USER_AGENT,
+        'Accept': 'application/json, text/html, */*'
+    })
+    return session
+
+
+_EDGAR_ARCHIVES_URL = "https://www.sec.gov/Archives/edgar/data"
+
+# Prospectus form prefixes, most preferred first
+_FORM_PRIORITY = ('497K', '497', 'N-1A', '485BPOS', '485APOS')
+_FORM_RANKS = {form: rank for rank, form in enumerate(_FORM_PRIORITY)}
+
+# Document type by URL file extension
+_DOCUMENT_TYPES = {'.pdf': 'PDF', '.htm': 'HTML', '.html': 'HTML'}
+
+
+def _form_rank(form: str) -> int:
+    """Position of the first preferred prefix the form matches; unmatched forms rank last"""
+    # Most filings carry one of the exact preferred forms
+    rank = _FORM_RANKS.get(form)
+    if rank is not None:
+        return rank
+    
+    # Variants such as 497J or N-1A/A rank by prefix
+    for rank, prefix in enumerate(_FORM_PRIORITY):
+        if form.startswith(prefix):
+            return rank
+    return len(_FORM_PRIORITY)
+
+
+@lru_cache(maxsize=4096)
+def _archive_path(cik: str, accession_number: str) -> str:
+    """Archive directory for a filing; funds of one registrant share these, so memoized"""
+    # Archive paths drop the CIK's leading zeros and the accession number's dashes
+    return f"{cik.lstrip('0')}/{accession_number.replace('-', '')}"
+
+
+_MUTUAL_FUND_TICKERS_URL = "https://www.sec.gov/files/company_tickers_mf.json"
+
+
+def _index_mutual_fund_tickers(tickers: Dict[str, Any]) -> Dict[str, list]:
+    """Index mutual fund ticker records by upper-cased symbol for O(1) lookups"""
+    index = {}
+    if 'fields' in tickers and 'data' in tickers:
+        for record in tickers['data']:
+            if len(record) >= 4 and isinstance(record[3], str):
+                # Keep the first record per symbol, as the previous linear scan did
+                index.setdefault(record[3].upper(), record)
+    return index
+
+
+def _write_atomic(path: Path, data: bytes):
+    """Write a file via a temporary sibling and os.replace, so readers never see a partial file"""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
 class SECClient:
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
         self.base_url = settings.SEC_API_BASE_URL
         self.data_api_url = "https://data.sec.gov"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': settings.USER_AGENT,
-            'Accept': 'application/json, text/html, */*'
-        })
+        # Accept an existing session so callers can share one connection pool
+        self.session = session or create_session()
         self.logger = logging.getLogger(__name__)
+        
+        # Mutual fund tickers index, loaded on first use and kept for this client's lifetime
+        self._mutual_fund_index = None
+        self._tickers_lock = threading.Lock()
     
     def get_latest_prospectus(self, fund_symbol: str, known_cik: str = None) -> Optional[ProspectusData]:
         """Retrieve the latest prospectus for a given fund symbol"""
@@ -68,7 +164,7 @@ class SECClient:
             # Step 5: Create ProspectusData object
             prospectus_data = ProspectusData(
                 fund_symbol=fund_symbol,
-                filing_date=datetime.strptime(latest_filing['filingDate'], '%Y-%m-%d'),
+                filing_date=datetime.fromisoformat(latest_filing['filingDate']),
                 document_type=self._determine_document_type(latest_filing['documentUrl']),
                 content=document_content,
                 source_url=latest_filing['documentUrl'],
@@ -92,30 +188,17 @@ class SECClient:
             url = f"{self.data_api_url}/api/xbrl/companyfacts/CIK{fund_symbol}.json"
             
             self._rate_limit()
-            response = self.session.get(url)
+            response = self.session.get(url, timeout=settings.REQUEST_TIMEOUT)
             
             if response.status_code == 200:
                 return fund_symbol.zfill(10)  # CIK is 10 digits, zero-padded
             
-            # If that fails, try searching through company tickers (corrected URL and data structure)
-            tickers_url = "https://www.sec.gov/files/company_tickers_mf.json"
-            
-            self._rate_limit()
-            response = self.session.get(tickers_url)
-            
-            if response.status_code == 200:
-                tickers_data = response.json()
-                
-                # Handle the correct data structure: {"fields": [...], "data": [...]}
-                if 'fields' in tickers_data and 'data' in tickers_data:
-                    fields = tickers_data['fields']  # ["cik", "seriesId", "classId", "symbol"]
-                    
-                    # Search for the fund symbol in the data array
-                    for record in tickers_data['data']:
-                        if len(record) >= 4:
-                            cik, series_id, class_id, symbol = record[:4]
-                            if symbol.upper() == fund_symbol.upper():
-                                return str(cik).zfill(10)
+            # If that fails, look the symbol up in the mutual fund tickers file
+            mf_index = self.get_mutual_fund_index()
+            if mf_index:
+                record = mf_index.get(fund_symbol.upper())
+                if record:
+                    return str(record[0]).zfill(10)
             
             # If still not found, try a broader search approach
             return self._search_cik_by_name(fund_symbol)
@@ -124,6 +207,116 @@ class SECClient:
             self.logger.error(f"Error finding CIK for {fund_symbol}: {str(e)}")
             return None
     
+    def get_mutual_fund_index(self) -> Optional[Dict[str, list]]:
+        """Upper-cased symbol -> record from the SEC mutual fund tickers file, loaded once per client"""
+        if self._mutual_fund_index is None:
+            with self._tickers_lock:
+                if self._mutual_fund_index is None:
+                    tickers = self._load_mutual_fund_tickers()
+                    if not tickers:
+                        return None
+                    self._mutual_fund_index = _index_mutual_fund_tickers(tickers)
+        return self._mutual_fund_index
+    
+    def clear_ticker_cache(self):
+        """Forget the loaded mutual fund tickers; the next lookup revalidates the on-disk copy"""
+        with self._tickers_lock:
+            self._mutual_fund_index = None
+    
+    def _load_mutual_fund_tickers(self) -> Optional[Dict[str, Any]]:
+        """Load SEC mutual fund tickers JSON, revalidating the on-disk copy with a conditional GET"""
+        cache_path = settings.CACHE_DIR / 'company_tickers_mf.json'
+        meta_path = cache_path.with_suffix(cache_path.suffix + '.meta.json')
+        cache_meta = self._load_cache_metadata(cache_path, meta_path)
+        
+        headers = {}
+        if cache_meta:
+            if cache_meta.get('etag'):
+                headers['If-None-Match'] = cache_meta['etag']
+            if cache_meta.get('last_modified'):
+                headers['If-Modified-Since'] = cache_meta['last_modified']
+            
+            # Without validators the copy can't be revalidated, so trust it until it ages out
+            if not headers:
+                age = (datetime.now() - datetime.fromisoformat(cache_meta['fetched_at'])).total_seconds()
+                if age < settings.CACHE_TTL:
+                    tickers = self._read_cached_tickers(cache_path, meta_path)
+                    if tickers is not None:
+                        self.logger.info("Using cached mutual fund tickers")
+                        return tickers
+        
+        self.logger.info("Fetching mutual fund tickers from SEC...")
+        url = _MUTUAL_FUND_TICKERS_URL
+        
+        self._rate_limit()
+        response = self.session.get(url, headers=headers, timeout=settings.REQUEST_TIMEOUT)
+        
+        if response.status_code == 304 and cache_meta:
+            tickers = self._read_cached_tickers(cache_path, meta_path)
+            if tickers is not None:
+                self.logger.info("Mutual fund tickers unchanged since last download, using cached copy")
+                return tickers
+            
+            # The cached copy was unusable and has been dropped; fetch the full file
+            self._rate_limit()
+            response = self.session.get(url, headers={}, timeout=settings.REQUEST_TIMEOUT)
+        
+        if response.status_code != 200:
+            self.logger.warning(f"Failed to fetch mutual fund tickers: HTTP {response.status_code}")
+            return None
+        
+        tickers = json.loads(response.content)
+        self._save_tickers_cache(cache_path, meta_path, response)
+        return tickers
+    
+    def _load_cache_metadata(self, cache_path, meta_path) -> Optional[Dict[str, Any]]:
+        """Load the metadata sidecar of a cached download, if both files are present and valid"""
+        try:
+            if not cache_path.exists() or not meta_path.exists():
+                return None
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                cache_meta = json.load(f)
+            if not isinstance(cache_meta, dict):
+                raise ValueError("metadata is not a JSON object")
+            for key in ('etag', 'last_modified'):
+                if not isinstance(cache_meta.get(key), (str, type(None))):
+                    raise ValueError(f"invalid {key}")
+            datetime.fromisoformat(cache_meta['fetched_at'])
+            return cache_meta
+        except Exception as e:
+            self.logger.warning(f"Discarding unreadable cache metadata {meta_path}: {str(e)}")
+            # A bad sidecar would fail the same way on every run, so drop the whole cache entry
+            cache_path.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+            return None
+    
+    def _read_cached_tickers(self, cache_path, meta_path) -> Optional[Dict[str, Any]]:
+        """Parse a cached tickers download, discarding it (and its validators) if unreadable"""
+        try:
+            return json.loads(cache_path.read_bytes())
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Discarding unreadable cached mutual fund tickers: {str(e)}")
+            # Without the sidecar the next request carries no validators, so SEC sends the full file
+            cache_path.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+            return None
+    
+    def _save_tickers_cache(self, cache_path, meta_path, response):
+        """Persist a tickers download and its HTTP validators for the next run"""
+        try:
+            cache_meta = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'fetched_at': datetime.now().isoformat()
+            }
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Body first, sidecar last: validators never point at a partially written body
+            _write_atomic(cache_path, response.content)
+            _write_atomic(meta_path, json.dumps(cache_meta, indent=2).encode('utf-8'))
+        except Exception as e:
+            # Caching is best effort - the freshly downloaded data is still used
+            self.logger.warning(f"Could not cache mutual fund tickers: {str(e)}")
+    
     def _search_cik_by_name(self, fund_symbol: str) -> Optional[str]:
         """Search for CIK using company name search (fallback method)"""
         try:
@@ -149,22 +342,8 @@ class SECClient:
     
     def _search_edgar_filings(self, cik: str, fund_symbol: str) -> Optional[List[Dict[str, Any]]]:
         """Search EDGAR database for fund filings"""
-        try:
-            # Use the SEC data API to get recent filings
-            url = f"{self.data_api_url}/api/xbrl/companyfacts/CIK{cik.zfill(10)}.json"
-            
-            self._rate_limit()
-            response = self.session.get(url)
-            
-            if response.status_code != 200:
-                # Try alternative approach using submissions API
-                return self._search_filings_via_submissions(cik)
-            
-            return self._search_filings_via_submissions(cik)
-            
-        except Exception as e:
-            self.logger.error(f"Error searching EDGAR filings: {str(e)}")
-            return None
+        # The submissions API lists recent filings directly; companyfacts carries no filing list
+        return self._search_filings_via_submissions(cik)
     
     def _search_filings_via_submissions(self, cik: str) -> Optional[List[Dict[str, Any]]]:
         """Search filings using the submissions API"""
@@ -172,37 +351,35 @@ class SECClient:
             url = f"{self.data_api_url}/submissions/CIK{cik.zfill(10)}.json"
             
             self._rate_limit()
-            response = self.session.get(url)
+            response = self.session.get(url, timeout=settings.REQUEST_TIMEOUT)
             
             if response.status_code != 200:
                 self.logger.warning(f"Submissions API returned {response.status_code}")
                 return None
             
-            data = response.json()
+            # Parsed once, straight from the raw bytes
+            data = json.loads(response.content)
             
-            if 'filings' not in data or 'recent' not in data['filings']:
+            recent_filings = data.get('filings', {}).get('recent')
+            if not recent_filings:
                 self.logger.warning("No recent filings found in submissions data")
                 return None
             
-            recent_filings = data['filings']['recent']
-            
             # Filter for prospectus-related forms (497, 497K, N-1A, etc.)
-            prospectus_forms = ['497', '497K', 'N-1A', '485BPOS', '485APOS']
-            
             filings = []
-            for i in range(len(recent_filings['form'])):
-                form = recent_filings['form'][i]
-                if any(form.startswith(pf) for pf in prospectus_forms):
+            for form, filing_date, accession_number, primary_document in zip(
+                recent_filings['form'],
+                recent_filings['filingDate'],
+                recent_filings['accessionNumber'],
+                recent_filings['primaryDocument']
+            ):
+                if form.startswith(_FORM_PRIORITY):
                     filing = {
                         'form': form,
-                        'filingDate': recent_filings['filingDate'][i],
-                        'accessionNumber': recent_filings['accessionNumber'][i],
-                        'primaryDocument': recent_filings['primaryDocument'][i],
-                        'documentUrl': self._build_document_url(
-                            cik, 
-                            recent_filings['accessionNumber'][i], 
-                            recent_filings['primaryDocument'][i]
-                        )
+                        'filingDate': filing_date,
+                        'accessionNumber': accession_number,
+                        'primaryDocument': primary_document,
+                        'documentUrl': self._build_document_url(cik, accession_number, primary_document)
                     }
                     filings.append(filing)
             
@@ -218,29 +395,16 @@ class SECClient:
     
     def _build_document_url(self, cik: str, accession_number: str, primary_document: str) -> str:
         """Build the full URL for a document"""
-        # Remove dashes from accession number for URL
-        accession_clean = accession_number.replace('-', '')
-        
-        base_url = "https://www.sec.gov/Archives/edgar/data"
-        cik_clean = cik.lstrip('0')  # Remove leading zeros for URL
-        
-        return f"{base_url}/{cik_clean}/{accession_clean}/{primary_document}"
+        return f"{_EDGAR_ARCHIVES_URL}/{_archive_path(cik, accession_number)}/{primary_document}"
     
     def _find_latest_prospectus(self, filings: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         """Find the most recent prospectus from the list of filings"""
         if not filings:
             return None
         
-        # Prioritize certain form types
-        form_priority = ['497K', '497', 'N-1A', '485BPOS', '485APOS']
-        
-        for form_type in form_priority:
-            for filing in filings:
-                if filing['form'].startswith(form_type):
-                    return filing
-        
-        # If no preferred form found, return the most recent
-        return filings[0] if filings else None
+        # Best-ranked form wins; min keeps the earliest (most recent) filing on ties,
+        # which is also the fallback when no preferred form is present
+        return min(filings, key=lambda filing: _form_rank(filing['form']))
     
     def _download_document(self, document_url: str) -> Optional[bytes]:
         """Download document content from SEC"""
@@ -248,7 +412,7 @@ class SECClient:
             self.logger.info(f"Downloading document from: {document_url}")
             
             self._rate_limit()
-            response = self.session.get(document_url)
+            response = self.session.get(document_url, timeout=settings.REQUEST_TIMEOUT)
             
             if response.status_code == 200:
                 self.logger.info(f"Successfully downloaded document ({len(response.content)} bytes)")
@@ -263,14 +427,9 @@ class SECClient:
     
     def _determine_document_type(self, document_url: str) -> str:
         """Determine if document is HTML or PDF based on URL"""
-        if document_url.lower().endswith('.pdf'):
-            return 'PDF'
-        elif document_url.lower().endswith(('.htm', '.html')):
-            return 'HTML'
-        else:
-            # Default to HTML for SEC filings
-            return 'HTML'
+        # Default to HTML for SEC filings
+        return _DOCUMENT_TYPES.get(document_url[document_url.rfind('.'):].lower(), 'HTML')
     
     def _rate_limit(self):
         """Implement rate limiting for SEC API calls"""
-        time.sleep(settings.REQUEST_DELAY)
\ No newline at end of file
+        rate_limit()
\ No newline at end of file
@@ -5,10 +5,10 @@ Utility functions for logging and common operations.
 import logging
 import re
 import sys
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, List, Dict, Any
-from urllib.parse import urlparse
 
 from config.settings import settings
 
@@ -53,11 +53,28 @@ def setup_logging():
     logger.info(f"Logging configured - Level: {settings.LOG_LEVEL}, Log file: {log_file}")
 
 
+# Fund symbol patterns, compiled once rather than looked up in re's cache per call
+_SYMBOL_CHARS_RE = re.compile(r'^[A-Z0-9\-\.]+$')
+_NON_SYMBOL_CHARS_RE = re.compile(r'[^A-Z0-9\-\.]')
+_INVALID_SYMBOL_RES = (
+    re.compile(r'^\-+$'),  # All dashes
+    re.compile(r'^\.+$'),  # All dots
+    re.compile(r'.*\-\-.*'),  # Double dashes
+    re.compile(r'.*\.\..*'),  # Double dots
+)
+
+
 def validate_fund_symbol(symbol: str) -> bool:
     """Validate fund symbol format"""
+    # Type check before the cached helper so unhashable input returns False
     if not symbol or not isinstance(symbol, str):
         return False
-    
+    return _validate_symbol_str(symbol)
+
+
+@lru_cache(maxsize=4096)
+def _validate_symbol_str(symbol: str) -> bool:
+    """Validate a non-empty symbol string (cached)"""
     # Remove whitespace and convert to uppercase
     symbol = symbol.strip().upper()
     
@@ -66,7 +83,7 @@ def validate_fund_symbol(symbol: str) -> bool:
         return False
     
     # Check character set - letters, numbers, and some common special characters
-    if not re.match(r'^[A-Z0-9\-\.]+$', symbol):
+    if not _SYMBOL_CHARS_RE.match(symbol):
         return False
     
     # Additional validation rules
@@ -80,15 +97,8 @@ def validate_fund_symbol(symbol: str) -> bool:
         return False
     
     # Check for common invalid patterns
-    invalid_patterns = [
-        r'^\-+$',  # All dashes
-        r'^\.+$',  # All dots
-        r'.*\-\-.*',  # Double dashes
-        r'.*\.\..*',  # Double dots
-    ]
-    
-    for pattern in invalid_patterns:
-        if re.match(pattern, symbol):
+    for pattern in _INVALID_SYMBOL_RES:
+        if pattern.match(symbol):
             return False
     
     return True
@@ -98,12 +108,18 @@ def normalize_fund_symbol(symbol: str) -> Optional[str]:
     """Normalize fund symbol to standard format"""
     if not validate_fund_symbol(symbol):
         return None
+    return _normalize_symbol_str(symbol)
+
+
+@lru_cache(maxsize=4096)
+def _normalize_symbol_str(symbol: str) -> Optional[str]:
+    """Normalize an already validated symbol string (cached)"""
     
     # Convert to uppercase and strip whitespace
     normalized = symbol.strip().upper()
     
     # Remove any invalid characters that might have slipped through
-    normalized = re.sub(r'[^A-Z0-9\-\.]', '', normalized)
+    normalized = _NON_SYMBOL_CHARS_RE.sub('', normalized)
     
     return normalized if normalized else None
 
@@ -135,23 +151,42 @@ def parse_filing_date(date_str: str) -> Optional[datetime]:
     return None
 
 
+# Optional scheme and netloc of a URL; matched directly rather than via urlparse
+_URL_RE = re.compile(r'(?:([A-Za-z][A-Za-z0-9+.\-]*):)?//([^/?#]+)')
+_SEC_DOMAINS = frozenset({'sec.gov', 'www.sec.gov', 'data.sec.gov'})
+# Leading C0 controls/spaces and embedded tabs/newlines, which urlparse drops
+_URL_LEADING_JUNK = ''.join(map(chr, range(0x21)))
+_URL_UNSAFE_CHARS = ('\t', '\r', '\n')
+
+
+def _match_url(url: str) -> Optional[re.Match]:
+    """Match the scheme and netloc of a URL, or None where urlparse finds no netloc"""
+    if not isinstance(url, str):
+        return None
+    url = url.lstrip(_URL_LEADING_JUNK)
+    for char in _URL_UNSAFE_CHARS:
+        if char in url:
+            url = url.replace(char, '')
+    match = _URL_RE.match(url)
+    if match is None:
+        return None
+    netloc = match.group(2)
+    # urlparse raises on an unbalanced IPv6 bracket
+    if ('[' in netloc) != (']' in netloc):
+        return None
+    return match
+
+
 def validate_url(url: str) -> bool:
     """Validate if a string is a proper URL"""
-    try:
-        result = urlparse(url)
-        return all([result.scheme, result.netloc])
-    except Exception:
-        return False
+    match = _match_url(url)
+    return match is not None and match.group(1) is not None
 
 
 def is_sec_url(url: str) -> bool:
     """Check if URL is from SEC domain"""
-    try:
-        parsed = urlparse(url)
-        sec_domains = ['sec.gov', 'www.sec.gov', 'data.sec.gov']
-        return parsed.netloc.lower() in sec_domains
-    except Exception:
-        return False
+    match = _match_url(url)
+    return match is not None and match.group(2).lower() in _SEC_DOMAINS
 
 
 def extract_cik_from_url(url: str) -> Optional[str]:
@@ -174,18 +209,24 @@ def extract_cik_from_url(url: str) -> Optional[str]:
         return None
 
 
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+
 def format_file_size(size_bytes: int) -> str:
     """Format file size in human-readable format"""
-    if size_bytes == 0:
+    size_bytes = int(size_bytes)
+    if size_bytes <= 0:
         return "0 B"
     
-    size_names = ["B", "KB", "MB", "GB", "TB"]
-    i = 0
-    while size_bytes >= 1024 and i < len(size_names) - 1:
-        size_bytes /= 1024.0
-        i += 1
-    
-    return f"{size_bytes:.1f} {size_names[i]}"
+    # Each unit spans 10 bits, so the bit length picks the unit directly
+    i = min((size_bytes.bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (10 * i)):.1f} {_SIZE_UNITS[i]}"
+
+
+# Control characters stripped by sanitize_text (tab, newline, CR and NEL are kept)
+_CONTROL_CHAR_TABLE = dict.fromkeys(
+    [*range(0x00, 0x09), 0x0b, 0x0c, *range(0x0e, 0x20), *range(0x7f, 0x85), *range(0x86, 0xa0)]
+)
 
 
 def sanitize_text(text: str, max_length: int = None) -> str:
@@ -194,7 +235,7 @@ def sanitize_text(text: str, max_length: int = None) -> str:
         return ""
     
     # Remove or replace problematic characters
-    sanitized = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x84\x86-\x9f]', '', text)
+    sanitized = text.translate(_CONTROL_CHAR_TABLE)
     
     # Normalize whitespace
     sanitized = ' '.join(sanitized.split())
@@ -223,7 +264,7 @@ def create_summary_report(data: List[Dict[str, Any]]) -> Dict[str, Any]:
     
     # Count file types
     file_types = {}
-    fund_symbols = set()
+    fund_symbols = {}  # dict used as an ordered set
     
     for item in data:
         if item.get('success', False):
@@ -236,7 +277,7 @@ def create_summary_report(data: List[Dict[str, Any]]) -> Dict[str, Any]:
             # Collect fund symbols
             symbol = item.get('fund_symbol')
             if symbol:
-                fund_symbols.add(symbol)
+                fund_symbols[symbol] = None
     
     return {
         'total_files': total_files,
@@ -247,7 +288,7 @@ def create_summary_report(data: List[Dict[str, Any]]) -> Dict[str, Any]:
         'total_size_formatted': format_file_size(total_size),
         'file_types': file_types,
         'unique_fund_symbols': len(fund_symbols),
-        'fund_symbols': sorted(list(fund_symbols))
+        'fund_symbols': sorted(fund_symbols)
     }
 
 
@@ -298,15 +339,20 @@ class ProgressTracker:
         self.description = description
         self.logger = logging.getLogger(__name__)
         self.start_time = datetime.now()
+        self._last_reported_pct = -1
     
     def update(self, increment: int = 1):
-        """Update progress"""
+        """Update progress, logging at most once per whole percentage point"""
         self.current += increment
         if self.total > 0:
+            pct = self.current * 100 // self.total
+            if pct == self._last_reported_pct:
+                return
+            self._last_reported_pct = pct
             percentage = (self.current / self.total) * 100
-            self.logger.info(f"{self.description}: {self.current}/{self.total} ({percentage:.1f}%)")
+            self.logger.info("%s: %d/%d (%.1f%%)", self.description, self.current, self.total, percentage)
     
     def finish(self):
         """Mark as finished"""
         duration = (datetime.now() - self.start_time).total_seconds()
-        self.logger.info(f"{self.description} completed: {self.current}/{self.total} in {duration:.2f}s")
\ No newline at end of file
+        self.logger.info("%s completed: %d/%d in %.2fs", self.description, self.current, self.total, duration)
\ No newline at end of file
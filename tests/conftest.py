@@ -0,0 +1,23 @@
+"""
+Shared pytest fixtures for the test suite.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from src.generic_fund_processor import GenericFundProcessor
+
+
+@pytest.fixture(scope="module")
+def processor():
+    """GenericFundProcessor built once and shared by every test in a module"""
+    return GenericFundProcessor(session=MagicMock(spec=requests.Session))
+
+
+@pytest.fixture
+def processor_no_discovery(processor):
+    """Shared processor whose fund discovery always comes back empty"""
+    with patch.object(processor, '_discover_fund_info', return_value=None):
+        yield processor